@@ -1,8 +1,24 @@
 Certainly! Below is a **pytest** standard test file (`test_ts34_app_conformance.py`) derived from your template. Since the actual requirements from "section 4" are not enumerated, I’ll abstract them so you can plug in concrete checks easily. This script assumes you have Python functions or mocks to interact with and test your IoT Device and environment.
 
 ```python
+import os
+import sqlite3
+import threading
+import time
+
 import pytest
 
+# Results store settings (append-only SQLite database in WAL mode).
+# Runs are archived only when TEST_RESULTS_DB or TEST_RUN_ID is set, so ad-hoc
+# local runs stay out of the nightly history.
+RESULTS_DB_PATH = os.environ.get('TEST_RESULTS_DB', 'test_results.db')
+ARCHIVE_RESULTS = 'TEST_RESULTS_DB' in os.environ or 'TEST_RUN_ID' in os.environ
+SPEC_HASH = '731ed0be'
+# All workers of one run must share TEST_RUN_ID (and TEST_RUN_TIMESTAMP, used
+# to order runs); the fallback only identifies a single-process run.
+RUN_TIMESTAMP = int(os.environ.get('TEST_RUN_TIMESTAMP', time.time()))
+RUN_ID = os.environ.get('TEST_RUN_ID', f'local-{time.time_ns()}-{os.getpid()}')
+
 # Mocked helpers (to be replaced by DUT integration or your harness)
 def get_section4_requirements():
     # This would normally retrieve/parse all requirements from Section 4
@@ -40,18 +56,186 @@ def test_invalid_inputs(dut):
     # Attempt invalid operations/inputs
     return True
 
-def test_bandwidth_limits(dut, max_bandwidth):
-    # Operations at bandwidth limits
-    return True
+def check_bandwidth_limits(dut, max_bandwidth, tolerance=0.05):
+    # Operations at bandwidth limits: back-to-back payloads over a link shaped
+    # to max_bandwidth kbps complete at the link rate. The DUT's measured
+    # completion times must match within the tolerance either way: finishing
+    # early means the limit was exceeded, finishing late means it was not used.
+    measured = dut.get('completion_times')
+    if not measured:
+        return False
+    rate = max_bandwidth * 1000 / 8.0
+    payloads = dut.get('payloads', [1500] * len(measured))
+    expected, clock = [], 0.0
+    for size in payloads:
+        clock += size / rate
+        expected.append(clock)
+    return len(measured) == len(expected) and all(
+        abs(m - e) <= e * tolerance for m, e in zip(measured, expected))
 
 def restore_initial_state(dut):
     # Restore device to initial state after tests
     pass
 
-def archive_test_results(results):
-    # Archive results
-    pass
-
+def open_results_store(path=RESULTS_DB_PATH):
+    # Open (and create if needed) the append-only results store.
+    # WAL mode lets parallel workers append while readers query.
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute(
+        'CREATE TABLE IF NOT EXISTS results ('
+        ' requirement TEXT NOT NULL,'
+        ' spec_hash TEXT NOT NULL,'
+        ' run_id TEXT NOT NULL,'
+        ' run_ts INTEGER NOT NULL,'
+        ' conforms INTEGER NOT NULL,'
+        ' UNIQUE (requirement, spec_hash, run_id))'
+    )
+    # Covering indexes: first_failing_run and pass_rate_trend never read the table
+    conn.execute(
+        'CREATE INDEX IF NOT EXISTS results_req_spec_conforms_run'
+        ' ON results (requirement, spec_hash, conforms, run_ts, run_id)'
+    )
+    conn.execute(
+        'CREATE INDEX IF NOT EXISTS results_spec_run_conforms'
+        ' ON results (spec_hash, run_ts, run_id, conforms)'
+    )
+    return conn
+
+
+def archive_test_results(results, path=RESULTS_DB_PATH, spec_hash=SPEC_HASH,
+                         run_id=RUN_ID, run_ts=RUN_TIMESTAMP):
+    # Append all results of this run in a single batched transaction.
+    # A requirement is stored once per run; when several workers report it,
+    # the worst outcome is kept so a failure is never overwritten by a pass.
+    rows = [(r['requirement'], spec_hash, run_id, run_ts, int(bool(r['conforms']))) for r in results]
+    conn = open_results_store(path)
+    try:
+        with conn:
+            conn.executemany(
+                'INSERT INTO results (requirement, spec_hash, run_id, run_ts, conforms)'
+                ' VALUES (?, ?, ?, ?, ?)'
+                ' ON CONFLICT (requirement, spec_hash, run_id)'
+                ' DO UPDATE SET conforms = MIN(conforms, excluded.conforms)',
+                rows,
+            )
+    finally:
+        conn.close()
+    return len(rows)
+
+
+def first_failing_run(conn, requirement, spec_hash=SPEC_HASH):
+    # (run_id, run_ts) of the earliest run in which the requirement did not conform
+    return conn.execute(
+        'SELECT run_id, run_ts FROM results'
+        ' WHERE requirement = ? AND spec_hash = ? AND conforms = 0'
+        ' ORDER BY run_ts LIMIT 1',
+        (requirement, spec_hash),
+    ).fetchone()
+
+
+def pass_rate_trend(conn, spec_hash=SPEC_HASH, since_ts=0):
+    # [(run_id, run_ts, pass_rate), ...] ordered by run, one entry per archived run
+    return conn.execute(
+        'SELECT run_id, MIN(run_ts), AVG(conforms) FROM results'
+        ' WHERE spec_hash = ? AND run_ts >= ?'
+        ' GROUP BY run_id ORDER BY MIN(run_ts)',
+        (spec_hash, since_ts),
+    ).fetchall()
+
+
+
+class TraceabilityMatrix:
+    # Requirement x run coverage and pass/fail kept as integer bitmaps.
+    # Bit i of a bitmap stands for the i-th registered requirement, so
+    # coverage questions become set operations instead of list scans.
+
+    def __init__(self):
+        self.requirement_ids = []
+        self.bit_of = {}
+        self.spec_masks = {}
+        self.covered = {}
+        self.passed = {}
+        self.failed = {}
+
+    def bit(self, req_id):
+        # Bitmap holding only the requirement's bit, allocated on first use
+        if req_id not in self.bit_of:
+            self.bit_of[req_id] = len(self.requirement_ids)
+            self.requirement_ids.append(req_id)
+        return 1 << self.bit_of[req_id]
+
+    def register(self, spec, requirement_ids):
+        # Add the applicable requirements of a spec to the bit index
+        mask = self.spec_masks.get(spec, 0)
+        for req_id in requirement_ids:
+            mask |= self.bit(req_id)
+        self.spec_masks[spec] = mask
+
+    def record_run(self, run_id, results):
+        # Fold a run's [{'requirement', 'conforms'}, ...] into its bitmaps.
+        # Requirements outside any registered spec get a bit but no spec;
+        # a failure anywhere in the run wins over passes for the same requirement.
+        covered = self.covered.get(run_id, 0)
+        failed = self.failed.get(run_id, 0)
+        for result in results:
+            bit = self.bit(result['requirement'])
+            covered |= bit
+            if not result['conforms']:
+                failed |= bit
+        self.covered[run_id] = covered
+        self.failed[run_id] = failed
+        self.passed[run_id] = covered & ~failed
+
+    def ids(self, bitmap):
+        # Requirement IDs whose bits are set in the bitmap
+        found = []
+        while bitmap:
+            low = bitmap & -bitmap
+            found.append(self.requirement_ids[low.bit_length() - 1])
+            bitmap ^= low
+        return found
+
+    def failing(self, run_id):
+        return self.ids(self.failed.get(run_id, 0))
+
+    def uncovered(self, spec, run_id):
+        # Applicable requirements of the spec that the run did not test
+        return self.ids(self.spec_masks.get(spec, 0) & ~self.covered.get(run_id, 0))
+
+    def unproven(self, spec, run_id):
+        # Applicable requirements of the spec without a passing test in the run
+        return self.ids(self.spec_masks.get(spec, 0) & ~self.passed.get(run_id, 0))
+
+    def regressed_since(self, base_run_id, run_id):
+        # Requirements that passed in the base run but fail in the later run
+        return self.ids(self.passed.get(base_run_id, 0) & self.failed.get(run_id, 0))
+
+    @classmethod
+    def from_store(cls, conn, requirement_ids, spec_hash=SPEC_HASH):
+        # Rebuild run history for a spec from the archived results store.
+        # requirement_ids lists the spec's applicable requirements, so ones
+        # that were never archived still show up as uncovered.
+        # SQLite collapses each (run, requirement) to its worst outcome, and
+        # every run's bitmaps are built in a single pass over those rows.
+        matrix = cls()
+        matrix.register(spec_hash, requirement_ids)
+        rows = conn.execute(
+            'SELECT run_id, requirement, MIN(conforms) FROM results'
+            ' WHERE spec_hash = ? GROUP BY run_id, requirement',
+            (spec_hash,),
+        )
+        covered, failed, bit = matrix.covered, matrix.failed, matrix.bit
+        for run_id, requirement, conforms in rows:
+            req_bit = bit(requirement)
+            covered[run_id] = covered.get(run_id, 0) | req_bit
+            if not conforms:
+                failed[run_id] = failed.get(run_id, 0) | req_bit
+        for run_id, run_covered in covered.items():
+            failed.setdefault(run_id, 0)
+            matrix.passed[run_id] = run_covered & ~failed[run_id]
+        return matrix
 
 @pytest.fixture(scope='module')
 def dut():
@@ -70,7 +254,11 @@ def requirements():
 
 @pytest.fixture(scope='module')
 def test_results():
-    return []
+    results = []
+    yield results
+    # Archive on teardown so failing runs are stored too
+    if results and ARCHIVE_RESULTS:
+        archive_test_results(results)
 
 
 def test_extract_requirements(requirements):
@@ -81,10 +269,13 @@ def test_extract_requirements(requirements):
 @pytest.mark.dependency()
 def test_evaluate_each_requirement(dut, requirements, test_results):
     """Step 2–4: Evaluate device implementation against each requirement."""
+    failures = []
     for req in requirements:
         conforms = evaluate_requirement(dut, req)
         test_results.append({'requirement': req['id'], 'conforms': conforms})
-        assert conforms, f"Device does not conform: {req['desc']}"
+        if not conforms:
+            failures.append(req['desc'])
+    assert not failures, f"Device does not conform: {failures}"
 
 
 def test_power_cycle_conformance(dut):
@@ -117,7 +308,9 @@ def test_invalid_inputs_handling(dut):
 
 def test_bandwidth_limits_handling(dut):
     """Step 10: Operation at bandwidth limits."""
-    assert test_bandwidth_limits(dut, max_bandwidth=1000), "Device failed at bandwidth limits"
+    if 'completion_times' not in dut:
+        pytest.skip("DUT reports no measured completion times")
+    assert check_bandwidth_limits(dut, max_bandwidth=1000), "Device failed at bandwidth limits"
 
 
 def test_record_compliance_status(test_results):
@@ -127,11 +320,96 @@ def test_record_compliance_status(test_results):
         # In production, log or archive each compliance status
 
 
-def test_consolidate_results(test_results):
+def test_consolidate_results(requirements, test_results):
     """Step 12: Consolidate results to determine overall conformity."""
-    non_conformities = [r for r in test_results if not r['conforms']]
+    matrix = TraceabilityMatrix()
+    matrix.register(SPEC_HASH, [req['id'] for req in requirements])
+    matrix.record_run(RUN_ID, test_results)
+    non_conformities = matrix.failing(RUN_ID)
     assert len(non_conformities) == 0, f"Non-conforming requirements: {non_conformities}"
-    archive_test_results(test_results)
+    unproven = matrix.unproven(SPEC_HASH, RUN_ID)
+    assert unproven == [], f"Requirements without a passing test: {unproven}"
+
+
+def test_results_store_merges_parallel_workers(tmp_path):
+    """Workers sharing a run ID batch-insert into one run; failures are kept."""
+    path = str(tmp_path / 'results.db')
+    batches = [
+        [{'requirement': 'REQ_4.1', 'conforms': True}, {'requirement': 'REQ_4.2', 'conforms': True}],
+        [{'requirement': 'REQ_4.2', 'conforms': False}, {'requirement': 'REQ_4.3', 'conforms': True}],
+    ]
+    workers = [
+        threading.Thread(target=archive_test_results, args=(batch, path),
+                         kwargs={'run_id': 'nightly-1', 'run_ts': 100})
+        for batch in batches
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    conn = open_results_store(path)
+    rows = conn.execute('SELECT requirement, conforms FROM results ORDER BY requirement').fetchall()
+    conn.close()
+    assert rows == [('REQ_4.1', 1), ('REQ_4.2', 0), ('REQ_4.3', 1)]
+
+
+def test_first_failing_run_and_pass_rate_trend(tmp_path):
+    """Queries report the earliest failing run and the per-run pass rate."""
+    path = str(tmp_path / 'results.db')
+    archive_test_results([{'requirement': 'REQ_4.1', 'conforms': True},
+                          {'requirement': 'REQ_4.2', 'conforms': True}],
+                         path, run_id='nightly-1', run_ts=100)
+    archive_test_results([{'requirement': 'REQ_4.1', 'conforms': True},
+                          {'requirement': 'REQ_4.2', 'conforms': False}],
+                         path, run_id='nightly-2', run_ts=200)
+    archive_test_results([{'requirement': 'REQ_4.1', 'conforms': False},
+                          {'requirement': 'REQ_4.2', 'conforms': False}],
+                         path, run_id='nightly-3', run_ts=300)
+    conn = open_results_store(path)
+    try:
+        assert first_failing_run(conn, 'REQ_4.2') == ('nightly-2', 200)
+        assert first_failing_run(conn, 'REQ_4.1') == ('nightly-3', 300)
+        assert first_failing_run(conn, 'REQ_4.9') is None
+        assert pass_rate_trend(conn) == [('nightly-1', 100, 1.0), ('nightly-2', 200, 0.5), ('nightly-3', 300, 0.0)]
+        assert pass_rate_trend(conn, since_ts=200) == [('nightly-2', 200, 0.5), ('nightly-3', 300, 0.0)]
+        plan = ' '.join(row[-1] for row in conn.execute(
+            'EXPLAIN QUERY PLAN SELECT run_id, MIN(run_ts), AVG(conforms) FROM results'
+            ' WHERE spec_hash = ? AND run_ts >= ? GROUP BY run_id', (SPEC_HASH, 0)))
+        assert 'COVERING INDEX' in plan
+    finally:
+        conn.close()
+
+
+def test_traceability_failure_wins_across_record_calls():
+    """A failure recorded for a run is not undone by a later pass."""
+    matrix = TraceabilityMatrix()
+    matrix.register(SPEC_HASH, ['REQ_4.1'])
+    matrix.record_run('a', [{'requirement': 'REQ_4.1', 'conforms': False}])
+    matrix.record_run('a', [{'requirement': 'REQ_4.1', 'conforms': True}])
+    assert matrix.failing('a') == ['REQ_4.1']
+    assert matrix.unproven(SPEC_HASH, 'a') == ['REQ_4.1']
+
+
+def test_traceability_from_store(tmp_path):
+    """Run history rebuilt from the store answers uncovered and regression queries."""
+    path = str(tmp_path / 'results.db')
+    archive_test_results([{'requirement': 'REQ_4.1', 'conforms': True},
+                          {'requirement': 'REQ_4.2', 'conforms': True}],
+                         path, run_id='nightly-1', run_ts=100)
+    archive_test_results([{'requirement': 'REQ_4.1', 'conforms': True},
+                          {'requirement': 'REQ_4.2', 'conforms': False},
+                          {'requirement': 'REQ_X', 'conforms': True}],
+                         path, run_id='nightly-2', run_ts=200)
+    conn = open_results_store(path)
+    try:
+        matrix = TraceabilityMatrix.from_store(conn, ['REQ_4.1', 'REQ_4.2', 'REQ_4.3'])
+    finally:
+        conn.close()
+    assert matrix.uncovered(SPEC_HASH, 'nightly-2') == ['REQ_4.3']
+    assert matrix.unproven(SPEC_HASH, 'nightly-2') == ['REQ_4.2', 'REQ_4.3']
+    assert matrix.regressed_since('nightly-1', 'nightly-2') == ['REQ_4.2']
+    assert matrix.regressed_since('nightly-2', 'nightly-1') == []
+    assert list(matrix.spec_masks) == [SPEC_HASH]
 ```
 
 ---
@@ -15,6 +15,7 @@ import datetime
 import ssl
 import socket
 import json
+import heapq
 from typing import List, Dict, Any, Tuple
 from dataclasses import dataclass
 from unittest.mock import MagicMock, patch
@@ -48,25 +49,92 @@ class NetworkConfig:
     """Configuration for network emulation"""
     technology: str
     latency_ms: int
-    throughput_kbps: int
+    throughput_kbps: int  # sustained rate, refills the token bucket
+    burst_bytes: int = 1500  # token bucket depth, one MTU by default
+    line_rate_kbps: int = 0  # peak rate while tokens last; 0 means throughput_kbps
+
+# Typical technology profiles for LPWA bearers (peak vs sustained uplink)
+TECHNOLOGY_PROFILES = {
+    "LTE-M": NetworkConfig(technology="LTE-M", latency_ms=15, throughput_kbps=375, line_rate_kbps=1000),
+    "NB-IoT": NetworkConfig(technology="NB-IoT", latency_ms=1600, throughput_kbps=60, line_rate_kbps=160),
+}
+
+@dataclass
+class TokenBucket:
+    """Per-link token bucket: bursts go out at line rate, sustained traffic at the refill rate"""
+    rate_bytes_per_s: float
+    capacity_bytes: float
+    line_rate_bytes_per_s: float
+    tokens: float = 0.0
+    last_update: float = 0.0
+    busy_until: float = 0.0  # end of the last queued transmission
+
+    def refill(self, now: float) -> None:
+        """Add the tokens accrued since the last update"""
+        elapsed = now - self.last_update
+        self.tokens = min(self.capacity_bytes, self.tokens + elapsed * self.rate_bytes_per_s)
+        self.last_update = now
+
+    def send(self, now: float, payload_bytes: int) -> Tuple[float, float]:
+        """Queue a payload; return (queueing delay, transmit time) in seconds"""
+        start = max(now, self.busy_until)
+        self.refill(start)
+        line, rate = self.line_rate_bytes_per_s, self.rate_bytes_per_s
+        # Fluid model: at line rate the bucket drains at (line - rate) bytes/s;
+        # once empty, the rest of the payload is paced at the refill rate
+        drain = line - rate
+        burst_time = self.tokens / drain if drain > 0 else float("inf")
+        if burst_time * line >= payload_bytes:
+            transmit = payload_bytes / line
+            self.tokens = min(self.capacity_bytes, self.tokens - drain * transmit)
+        else:
+            transmit = burst_time + (payload_bytes - burst_time * line) / rate
+            self.tokens = 0.0
+        self.last_update = self.busy_until = start + transmit
+        return start - now, transmit
     
+
 class NetworkEmulator:
     """Simulates different network conditions"""
     
     def __init__(self):
         self.current_config = None
         self.signaling_events = []
+        self.clock = 0.0  # virtual time in seconds, advanced by the scheduler
+        self.epoch = datetime.datetime.now()  # wall-clock time at clock == 0
+        self.links: Dict[str, TokenBucket] = {}
+        self.pending: List[Tuple[float, int, str, int]] = []
+        self.delivered: List[Tuple[float, str, int]] = []
+        self._sequence = 0
     
     def configure(self, config: NetworkConfig) -> bool:
         """Set network parameters"""
         logger.info(f"Configuring network to {config.technology}: latency={config.latency_ms}ms, throughput={config.throughput_kbps}kbps")
         self.current_config = config
+        rate = config.throughput_kbps * 1000 / 8.0
+        line_rate = (config.line_rate_kbps or config.throughput_kbps) * 1000 / 8.0
+        links = {}
+        for link in ("uplink", "downlink"):
+            bucket = TokenBucket(rate, config.burst_bytes, line_rate, tokens=config.burst_bytes, last_update=self.clock)
+            previous = self.links.get(link)
+            if previous:
+                # Payloads already queued keep their schedule; new ones queue behind them
+                previous.refill(max(self.clock, previous.last_update))
+                bucket.tokens = min(bucket.capacity_bytes, previous.tokens)
+                bucket.last_update = previous.last_update
+                bucket.busy_until = previous.busy_until
+            links[link] = bucket
+        self.links = links
         return True
         
+    def now(self) -> datetime.datetime:
+        """Current time on the virtual clock"""
+        return self.epoch + datetime.timedelta(seconds=self.clock)
+        
     def record_signaling_event(self, event_type: str, reason: str) -> None:
         """Record a network signaling event"""
         event = ConnectionEvent(
-            timestamp=datetime.datetime.now(),
+            timestamp=self.now(),
             event_type=event_type,
             reason=reason
         )
@@ -75,14 +143,32 @@ class NetworkEmulator:
         
     def count_signaling_in_window(self, window_minutes: int = 5) -> int:
         """Count signaling events in the last n minutes"""
-        now = datetime.datetime.now()
+        now = self.now()
         cutoff = now - datetime.timedelta(minutes=window_minutes)
         return sum(1 for event in self.signaling_events if event.timestamp >= cutoff)
     
-    def simulate_latency(self) -> None:
-        """Simulate network latency"""
-        if self.current_config:
-            time.sleep(self.current_config.latency_ms / 1000.0)
+    def transmit(self, payload_bytes: int, link: str = "uplink") -> float:
+        """Schedule a payload on a link; return its total delay in seconds"""
+        if not self.current_config:
+            return 0.0
+        queueing, transmit = self.links[link].send(self.clock, payload_bytes)
+        delay = queueing + transmit + self.current_config.latency_ms / 1000.0
+        self._sequence += 1
+        heapq.heappush(self.pending, (self.clock + delay, self._sequence, link, payload_bytes))
+        return delay
+    
+    def run_until(self, until: float) -> None:
+        """Deliver every scheduled payload due by `until` and advance the clock"""
+        while self.pending and self.pending[0][0] <= until:
+            deliver_at, _, link, payload_bytes = heapq.heappop(self.pending)
+            self.delivered.append((deliver_at, link, payload_bytes))
+        self.clock = max(self.clock, until)
+    
+    def simulate_latency(self, payload_bytes: int = 0, link: str = "uplink") -> float:
+        """Simulate network latency for a payload on the virtual clock"""
+        delay = self.transmit(payload_bytes, link)
+        self.run_until(self.clock + delay)
+        return delay
 
 class IoTDeviceClient:
     """Client interface to the IoT device"""
@@ -104,4 +190,87 @@ class IoTDeviceClient:
         self.certificate_validated = False
         self.failure_reported = False
     
-    def power_on(self) -> bool
\ No newline at end of file
+    def power_on(self) -> bool:
+        """Power on the device"""
+        logger.info(f"Powering on device {self.device_id}")
+        self.is_powered_on = True
+        return self.is_powered_on
+
+# --- Network shaping tests ---
+@pytest.fixture(params=sorted(TECHNOLOGY_PROFILES))
+def shaped_network(request) -> NetworkEmulator:
+    """Network emulator configured with one of the technology profiles"""
+    emulator = NetworkEmulator()
+    emulator.configure(TECHNOLOGY_PROFILES[request.param])
+    return emulator
+
+def line_and_refill_rates(config: NetworkConfig) -> Tuple[float, float]:
+    """(line rate, refill rate) of a configuration in bytes per second"""
+    return (config.line_rate_kbps or config.throughput_kbps) * 1000 / 8.0, config.throughput_kbps * 1000 / 8.0
+
+def test_payload_transmit_time(shaped_network):
+    """A payload within the burst pays serialization at line rate plus the latency"""
+    config = shaped_network.current_config
+    line, _ = line_and_refill_rates(config)
+    for _ in range(3):
+        delay = shaped_network.simulate_latency(1400)
+        assert delay == pytest.approx(1400 / line + config.latency_ms / 1000.0)
+
+def test_sustained_traffic_paced_by_refill(shaped_network):
+    """Back-to-back traffic beyond the burst queues at throughput_kbps"""
+    config = shaped_network.current_config
+    line, rate = line_and_refill_rates(config)
+    for _ in range(50):
+        shaped_network.transmit(1500)
+    shaped_network.run_until(3600)
+    times = [deliver_at for deliver_at, _, _ in shaped_network.delivered]
+    assert len(times) == 50
+    # The first payload rides the full bucket at line rate, the rest are paced
+    assert times[0] == pytest.approx(1500 / line + config.latency_ms / 1000.0)
+    assert [b - a for a, b in zip(times[1:], times[2:])] == pytest.approx([1500 / rate] * 48)
+    # Uplink traffic does not delay the downlink
+    assert shaped_network.transmit(1500, link="downlink") == pytest.approx(1500 / line + config.latency_ms / 1000.0)
+
+def test_burst_bytes_changes_delays():
+    """A deeper bucket lets a burst out at line rate before pacing starts"""
+    def burst_delays(burst_bytes: int) -> List[float]:
+        emulator = NetworkEmulator()
+        emulator.configure(NetworkConfig(technology="test", latency_ms=0, throughput_kbps=80,
+                                         burst_bytes=burst_bytes, line_rate_kbps=800))
+        return [emulator.transmit(1000) for _ in range(8)]
+
+    line, rate = 100000.0, 10000.0
+    # Burst of 5000 bytes: five payloads at line rate, then pacing takes over
+    deep = burst_delays(5000)
+    assert deep[:5] == pytest.approx([(i + 1) * 1000 / line for i in range(5)])
+    assert deep[-1] - deep[-2] == pytest.approx(1000 / rate)
+    # A one-byte bucket paces from the first payload on
+    shallow = burst_delays(1)
+    assert shallow[1] - shallow[0] == pytest.approx(1000 / rate)
+    assert all(s > d for s, d in zip(shallow, deep))
+    # A huge bucket never paces within the test
+    assert burst_delays(10 ** 6) == pytest.approx([(i + 1) * 1000 / line for i in range(8)])
+
+def test_reconfigure_keeps_queued_payloads(shaped_network):
+    """Reconfiguring mid-transfer keeps the link backlog and pending deliveries"""
+    config = shaped_network.current_config
+    delays = [shaped_network.transmit(3000) for _ in range(3)]
+    backlog = shaped_network.links["uplink"].busy_until
+    slow = NetworkConfig(technology="slow", latency_ms=config.latency_ms,
+                         throughput_kbps=config.throughput_kbps // 2)
+    shaped_network.configure(slow)
+    # The bucket was emptied by the backlog, so the new payload is paced
+    _, slow_rate = line_and_refill_rates(slow)
+    delay = shaped_network.transmit(1000)
+    assert delay == pytest.approx(backlog + 1000 / slow_rate + config.latency_ms / 1000.0)
+    shaped_network.run_until(3600)
+    times = [deliver_at for deliver_at, _, _ in shaped_network.delivered]
+    assert times == pytest.approx(delays + [delay])
+
+def test_signaling_window_follows_virtual_clock(shaped_network):
+    """Signaling windows are measured on the emulator's virtual clock"""
+    shaped_network.record_signaling_event("activation", "data_transmission")
+    shaped_network.run_until(shaped_network.clock + 6 * 60)
+    shaped_network.record_signaling_event("activation", "data_transmission")
+    assert shaped_network.count_signaling_in_window(window_minutes=5) == 1
+```